@@ -3,6 +3,7 @@ import random
 import numpy as np
 
 from plugins.base import PluginBase
+from plugins.shindan.scoring import ANSWER_CHOICES, ShindanScorer
 
 
 # 野鳥撮影者タイプ診断プラグイン
@@ -73,39 +74,28 @@ class ShindanPlugin(PluginBase):
     #   regularization: 元スコアへの引き戻し強度
     def compute_matching_scores(self, data, n_samples=5000, n_iterations=100,
                                 lr=0.1, regularization=0.03):
-        components = data.get('components', [])
-        questions = data.get('questions', [])
-        birds = data.get('birds', [])
-
-        if not components or not questions or not birds:
+        scorer = ShindanScorer(data)
+        if not scorer.is_ready():
             return
 
-        component_names = [c['name'] for c in sorted(
-            components, key=lambda c: c.get('sort_order', 0)
-        )]
+        birds = scorer.birds
+        component_names = scorer.component_names
         n_comp = len(component_names)
         n_birds = len(birds)
-        answer_choices = ('yes', 'slightly_yes', 'slightly_no', 'no')
-
-        # 質問スコアを行列化: (n_questions, 4, n_comp)
-        n_questions = len(questions)
-        q_scores = np.zeros((n_questions, 4, n_comp))
-        for qi, question in enumerate(questions):
-            scores = question.get('scores', {})
-            for ai, choice in enumerate(answer_choices):
-                choice_scores = scores.get(choice, {})
-                for ci, comp_name in enumerate(component_names):
-                    q_scores[qi, ai, ci] = choice_scores.get(comp_name, 0)
+
+        # 質問スコア行列: (n_questions, 4, n_comp)
+        q_scores = scorer.q_scores
+        n_questions = len(q_scores)
 
         # 正規化用の最大・最小
-        max_possible = q_scores.max(axis=1).sum(axis=0)  # (n_comp,)
-        min_possible = q_scores.min(axis=1).sum(axis=0)  # (n_comp,)
+        max_possible = scorer.max_possible  # (n_comp,)
+        min_possible = scorer.min_possible  # (n_comp,)
         score_range = max_possible - min_possible
-        score_range[score_range == 0] = 1  # ゼロ除算防止
+        score_range = np.where(score_range == 0, 1, score_range)  # ゼロ除算防止
 
         # ユーザースコアサンプルを一括生成
         # ランダム回答インデックス: (n_samples, n_questions)
-        answer_indices = np.random.randint(0, 4, size=(n_samples, n_questions))
+        answer_indices = np.random.randint(0, len(ANSWER_CHOICES), size=(n_samples, n_questions))
         # 各サンプル・各質問の選択されたスコアを取得: (n_samples, n_questions, n_comp)
         q_idx = np.arange(n_questions)[np.newaxis, :]  # (1, n_questions)
         raw_samples = q_scores[q_idx, answer_indices, :]  # (n_samples, n_questions, n_comp)
@@ -116,16 +106,7 @@ class ShindanPlugin(PluginBase):
         user_centroid = user_samples.mean(axis=0)  # (n_comp,)
 
         # 鳥ベクトル初期化（z-score正規化）
-        bird_raw = np.array([
-            [b.get('scores', {}).get(name, 5) for name in component_names]
-            for b in birds
-        ], dtype=np.float64)  # (n_birds, n_comp)
-        bird_mean = bird_raw.mean(axis=0)
-        bird_std = bird_raw.std(axis=0)
-        bird_std_safe = np.where(bird_std > 0, bird_std, 1.0)
-        bird_vectors = np.clip((bird_raw - bird_mean) / bird_std_safe * 25 + 50, 0, 100)
-        # std==0 の成分は 50.0
-        bird_vectors[:, bird_std == 0] = 50.0
+        bird_vectors = scorer.zscore_bird_vectors()  # (n_birds, n_comp)
 
         original_vectors = bird_vectors.copy()
 
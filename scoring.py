@@ -0,0 +1,227 @@
+import numpy as np
+
+ANSWER_CHOICES = ('yes', 'slightly_yes', 'slightly_no', 'no')
+
+# 支配判定の許容誤差（同距離のタイは候補として残す）
+_DOMINANCE_EPS = 1e-9
+
+
+# 診断スコア計算エンジン
+# 回答からの成分スコア算出・正規化・野鳥マッチングを行う
+# 途中回答から最終スコアの取りうる範囲を求め、マッチする鳥が確定したかを判定できる
+class ShindanScorer:
+    # Args:
+    #   data: プラグインデータ（components, questions, birds を含む）
+    def __init__(self, data):
+        components = data.get('components', [])
+        self.questions = data.get('questions', [])
+        self.birds = data.get('birds', [])
+
+        # 成分名リスト（sort_order順）
+        self.component_names = [c['name'] for c in sorted(
+            components, key=lambda c: c.get('sort_order', 0)
+        )]
+        n_comp = len(self.component_names)
+
+        # 質問スコアを行列化: (n_questions, 4, n_comp)
+        self.q_scores = np.zeros((len(self.questions), len(ANSWER_CHOICES), n_comp))
+        for qi, question in enumerate(self.questions):
+            scores = question.get('scores', {})
+            for ai, choice in enumerate(ANSWER_CHOICES):
+                choice_scores = scores.get(choice, {})
+                for ci, comp_name in enumerate(self.component_names):
+                    self.q_scores[qi, ai, ci] = choice_scores.get(comp_name, 0)
+        self.question_index = {q['id']: qi for qi, q in enumerate(self.questions)}
+
+        # 各質問の成分ごとの最大・最小寄与: (n_questions, n_comp)
+        self.q_max = self.q_scores.max(axis=1) if len(self.questions) else np.zeros((0, n_comp))
+        self.q_min = self.q_scores.min(axis=1) if len(self.questions) else np.zeros((0, n_comp))
+
+        # 正規化用の最大・最小
+        self.max_possible = self.q_max.sum(axis=0)
+        self.min_possible = self.q_min.sum(axis=0)
+
+        self.bird_vectors = self._build_bird_vectors()
+
+    # 診断データが揃っているか
+    def is_ready(self):
+        return bool(self.component_names and self.questions and self.birds)
+
+    # 鳥の元スコア（1-10）をz-score正規化して0-100にスケールしたベクトル: (n_birds, n_comp)
+    # 成分ごとに平均0・標準偏差1に揃え、標準偏差0の成分は 50.0 とする
+    # NOTICE: matching_scores の最適化（ShindanPlugin.compute_matching_scores）の初期値にも使う
+    def zscore_bird_vectors(self):
+        names = self.component_names
+        if not self.birds:
+            return np.zeros((0, len(names)))
+
+        bird_raw = np.array([
+            [b.get('scores', {}).get(name, 5) for name in names]
+            for b in self.birds
+        ], dtype=np.float64).reshape(len(self.birds), len(names))
+        bird_mean = bird_raw.mean(axis=0)
+        bird_std = bird_raw.std(axis=0)
+        bird_std_safe = np.where(bird_std > 0, bird_std, 1.0)
+        vectors = np.clip((bird_raw - bird_mean) / bird_std_safe * 25 + 50, 0, 100)
+        vectors[:, bird_std == 0] = 50.0
+        return vectors
+
+    # マッチング用の鳥ベクトルを構築: (n_birds, n_comp)
+    # matching_scores（最適化済み0-100）があればそれを使用、なければz-score正規化にフォールバック
+    def _build_bird_vectors(self):
+        vectors = self.zscore_bird_vectors()
+        names = self.component_names
+        for i, bird in enumerate(self.birds):
+            if 'matching_scores' in bird:
+                vectors[i] = [bird['matching_scores'].get(name, 50) for name in names]
+        return vectors
+
+    # 回答の質問インデックス・選択肢インデックスを抽出（不正な回答は無視）
+    # Returns:
+    #   list: [(question_index, choice_index), ...]
+    def _answer_indices(self, answers):
+        indices = []
+        for q_id, answer in answers.items():
+            qi = self.question_index.get(q_id)
+            if qi is None or answer not in ANSWER_CHOICES:
+                continue
+            indices.append((qi, ANSWER_CHOICES.index(answer)))
+        return indices
+
+    # 回答を集計
+    # Returns:
+    #   tuple: (raw, answered)
+    #     raw: 回答済み質問の生スコア合計 (n_comp,)
+    #     answered: 質問ごとの回答済みフラグ (n_questions,)
+    def _accumulate(self, answers):
+        raw = np.zeros(len(self.component_names))
+        answered = np.zeros(len(self.questions), dtype=bool)
+        for qi, ai in self._answer_indices(answers):
+            raw += self.q_scores[qi, ai]
+            answered[qi] = True
+        return raw, answered
+
+    # 未回答の質問が各成分の最小・最大寄与を取るとした生スコアの範囲
+    # Returns:
+    #   tuple: (raw_lower, raw_upper) それぞれ (n_comp,) の配列
+    def _raw_bounds(self, raw, answered):
+        return (
+            raw + self.q_min[~answered].sum(axis=0),
+            raw + self.q_max[~answered].sum(axis=0),
+        )
+
+    # 生スコアを0-100に正規化（小数1桁）
+    # Args:
+    #   raw: 成分ごとの生スコア配列（末尾次元が n_comp）
+    # Returns:
+    #   np.ndarray: 正規化スコア
+    def normalize(self, raw):
+        score_range = self.max_possible - self.min_possible
+        safe_range = np.where(score_range > 0, score_range, 1)
+        normalized = np.clip((raw - self.min_possible) / safe_range * 100, 0, 100)
+        normalized = np.where(score_range > 0, normalized, 50.0)
+        return np.round(normalized, 1)
+
+    # 回答から正規化スコアを算出
+    # Returns:
+    #   dict: {成分名: 0-100}
+    def compute_scores(self, answers):
+        raw, _ = self._accumulate(answers)
+        normalized = self.normalize(raw)
+        return {name: float(normalized[ci]) for ci, name in enumerate(self.component_names)}
+
+    # 正規化スコアに最も近い鳥を返す（同距離の鳥はすべて返す）
+    # Returns:
+    #   list: 鳥データのリスト
+    def nearest_birds(self, scores):
+        if not self.birds:
+            return []
+        user_vector = np.array([scores.get(name, 0) for name in self.component_names])
+        distances = np.sqrt(((self.bird_vectors - user_vector) ** 2).sum(axis=1))
+        best = distances.min()
+        return [bird for bird, d in zip(self.birds, distances) if d == best]
+
+    # 途中回答から最終的な正規化スコアの取りうる範囲を算出
+    # 未回答の質問は各成分の最小・最大寄与を取るものとして区間を広げる
+    # NOTICE: 成分ごとに独立に上下限を取るため、実際に到達可能な範囲を包含する（保守的な）範囲になる
+    # Returns:
+    #   tuple: (lower, upper) それぞれ (n_comp,) の配列
+    def score_bounds(self, answers):
+        raw_lower, raw_upper = self._raw_bounds(*self._accumulate(answers))
+        return self.normalize(raw_lower), self.normalize(raw_upper)
+
+    # スコア範囲内のどこでも他の鳥より遠い鳥を除外し、最近傍になりうる鳥のマスクを返す
+    # |u - b_i|^2 - |u - b_j|^2 は u について線形なので、範囲の頂点で最大値を取る
+    # Args:
+    #   lower, upper: (..., n_comp) のスコア範囲
+    #   vectors: 判定対象の鳥ベクトル（省略時は全鳥）
+    # Returns:
+    #   np.ndarray: (..., n_birds) の bool マスク
+    def _candidate_mask(self, lower, upper, vectors=None):
+        b = self.bird_vectors if vectors is None else vectors
+        diff = b[:, np.newaxis, :] - b[np.newaxis, :, :]  # (i, j, c)
+        const = (b ** 2)[:, np.newaxis, :] - (b ** 2)[np.newaxis, :, :]
+        lower = lower[..., np.newaxis, np.newaxis, :]
+        upper = upper[..., np.newaxis, np.newaxis, :]
+        # 鳥 i が鳥 j より最も不利になる点での距離二乗差
+        worst = (const - 2 * np.where(diff > 0, lower, upper) * diff).sum(axis=-1)
+        # 範囲内の全域で i が j より近ければ j は最近傍になりえない
+        dominated = (worst < -_DOMINANCE_EPS).any(axis=-2)
+        return ~dominated
+
+    # 途中回答でマッチする鳥が確定したかを判定
+    # Args:
+    #   answers: {question_id: 回答} の途中回答
+    #   suggest_next: True なら残りの候補を最もよく絞り込む次の質問を選ぶ
+    # Returns:
+    #   dict: {decided, bird, candidates, remaining_questions, next_question}
+    #     bird: 確定時の鳥データ（未確定なら None）
+    #     candidates: 最近傍になりうる鳥データのリスト
+    #     next_question: 次に出すべき質問データ（suggest_next=False または確定時は None）
+    def check_early_finish(self, answers, suggest_next=False):
+        raw, answered = self._accumulate(answers)
+        raw_lower, raw_upper = self._raw_bounds(raw, answered)
+        mask = self._candidate_mask(self.normalize(raw_lower), self.normalize(raw_upper))
+        candidates = [bird for bird, ok in zip(self.birds, mask) if ok]
+        decided = len(candidates) == 1
+
+        unanswered = np.flatnonzero(~answered)
+
+        next_question = None
+        if suggest_next and not decided and unanswered.size:
+            best_qi = self._best_next_question(raw_lower, raw_upper, unanswered, mask)
+            next_question = self.questions[best_qi]
+
+        return {
+            'decided': decided,
+            'bird': candidates[0] if decided else None,
+            'candidates': candidates,
+            'remaining_questions': len(unanswered),
+            'next_question': next_question,
+        }
+
+    # 各未回答質問について4択それぞれを仮定したときの残り候補数の平均が最小の質問を選ぶ
+    # 範囲が狭まっても除外済みの鳥は候補に戻らず、除外済みの鳥に支配される鳥は
+    # 候補の鳥にも支配されるため、支配判定は現在の候補同士だけで行えば十分
+    # NOTICE: 計算量は O(未回答数 × 4 × 候補数^2 × 成分数)。候補100羽・30問で1回あたり100〜150ms程度かかる
+    # Args:
+    #   raw_lower, raw_upper: 現在の生スコアの範囲 (n_comp,)
+    #   unanswered: 未回答の質問インデックス
+    #   mask: 現在の候補マスク (n_birds,)
+    # Returns:
+    #   int: 質問インデックス
+    def _best_next_question(self, raw_lower, raw_upper, unanswered, mask):
+        vectors = self.bird_vectors[mask]
+
+        best_qi = int(unanswered[0])
+        best_key = None
+        for qi in unanswered:
+            # 質問 qi に各選択肢で答えた場合の範囲: (4, n_comp)
+            lower = self.normalize(raw_lower - self.q_min[qi] + self.q_scores[qi])
+            upper = self.normalize(raw_upper - self.q_max[qi] + self.q_scores[qi])
+            counts = self._candidate_mask(lower, upper, vectors).sum(axis=-1)
+            key = (counts.mean(), counts.max())
+            if best_key is None or key < best_key:
+                best_key = key
+                best_qi = int(qi)
+        return best_qi
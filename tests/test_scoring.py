@@ -0,0 +1,189 @@
+import copy
+import itertools
+import math
+import random
+import unittest
+
+from plugins.shindan.scoring import ANSWER_CHOICES, ShindanScorer
+from plugins.shindan.tools.load_test import build_fixture_data
+
+
+# 旧 ResultView のスコア計算・野鳥マッチング（リファクタ前の実装をそのまま移植した参照実装）
+def _reference_result(data, answers):
+    component_names = [c['name'] for c in sorted(
+        data['components'], key=lambda c: c.get('sort_order', 0)
+    )]
+    questions = data['questions']
+    birds = data['birds']
+
+    raw_scores = {name: 0 for name in component_names}
+    question_map = {q['id']: q for q in questions}
+    for q_id, answer in answers.items():
+        question = question_map.get(q_id)
+        if not question or answer not in ANSWER_CHOICES:
+            continue
+        for comp_name, value in question.get('scores', {}).get(answer, {}).items():
+            if comp_name in raw_scores:
+                raw_scores[comp_name] += value
+
+    max_possible = {name: 0 for name in component_names}
+    min_possible = {name: 0 for name in component_names}
+    for question in questions:
+        scores = question.get('scores', {})
+        for comp_name in component_names:
+            choice_values = [scores.get(choice, {}).get(comp_name, 0) for choice in ANSWER_CHOICES]
+            max_possible[comp_name] += max(choice_values)
+            min_possible[comp_name] += min(choice_values)
+
+    normalized_scores = {}
+    for name in component_names:
+        score_range = max_possible[name] - min_possible[name]
+        if score_range > 0:
+            normalized = (raw_scores[name] - min_possible[name]) / score_range * 100
+            normalized_scores[name] = round(max(0, min(100, normalized)), 1)
+        else:
+            normalized_scores[name] = 50.0
+
+    has_matching_scores = any('matching_scores' in b for b in birds)
+    if not has_matching_scores:
+        bird_mean = {}
+        bird_std = {}
+        for name in component_names:
+            values = [b.get('scores', {}).get(name, 5) for b in birds]
+            mean = sum(values) / len(values)
+            bird_mean[name] = mean
+            bird_std[name] = math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+
+    user_vector = [normalized_scores[name] for name in component_names]
+    best_ids = []
+    best_distance = float('inf')
+    for bird in birds:
+        if has_matching_scores:
+            bird_vector = [bird['matching_scores'].get(name, 50) for name in component_names]
+        else:
+            bird_vector = []
+            for name in component_names:
+                std = bird_std[name]
+                if std > 0:
+                    z = (bird.get('scores', {}).get(name, 5) - bird_mean[name]) / std
+                    bird_vector.append(max(0, min(100, z * 25 + 50)))
+                else:
+                    bird_vector.append(50.0)
+        distance = math.sqrt(sum((a - b) ** 2 for a, b in zip(user_vector, bird_vector)))
+        if distance < best_distance:
+            best_distance = distance
+            best_ids = [bird['id']]
+        elif distance == best_distance:
+            best_ids.append(bird['id'])
+    return normalized_scores, best_ids
+
+
+# matching_scores 付きの診断データ（最適化済みの鳥ベクトルを模す）
+def _with_matching_scores(data, seed):
+    data = copy.deepcopy(data)
+    rng = random.Random(seed)
+    for bird in data['birds']:
+        bird['matching_scores'] = {
+            c['name']: round(rng.uniform(0, 100), 1) for c in data['components']
+        }
+    return data
+
+
+def _random_answers(rng, questions):
+    return {q['id']: rng.choice(ANSWER_CHOICES) for q in questions}
+
+
+class ShindanScorerResultTest(unittest.TestCase):
+    # 全回答時のスコアとマッチする鳥が旧 ResultView と一致する
+    def test_matches_reference_result(self):
+        for seed in range(10):
+            for data in (build_fixture_data(seed=seed), _with_matching_scores(build_fixture_data(seed=seed), seed)):
+                scorer = ShindanScorer(data)
+                rng = random.Random(seed)
+                for _ in range(50):
+                    answers = _random_answers(rng, data['questions'])
+                    expected_scores, expected_ids = _reference_result(data, answers)
+                    scores = scorer.compute_scores(answers)
+                    self.assertEqual(scores, expected_scores)
+                    self.assertEqual([b['id'] for b in scorer.nearest_birds(scores)], expected_ids)
+
+    # 不正な質問IDや回答は無視される
+    def test_ignores_invalid_answers(self):
+        data = build_fixture_data()
+        scorer = ShindanScorer(data)
+        answers = _random_answers(random.Random(0), data['questions'])
+        noisy = {**answers, 'unknown-id': 'yes'}
+        noisy[data['questions'][0]['id']] = 'maybe'
+        expected = dict(answers)
+        del expected[data['questions'][0]['id']]
+        self.assertEqual(scorer.compute_scores(noisy), scorer.compute_scores(expected))
+
+
+class ShindanScorerEarlyFinishTest(unittest.TestCase):
+    # 途中回答の候補は、残りをどう答えても最近傍になる鳥をすべて含む（全組み合わせで検証）
+    def test_candidates_are_sound_exhaustive(self):
+        for seed in range(10):
+            data = build_fixture_data(n_questions=8, n_birds=6, seed=seed)
+            scorer = ShindanScorer(data)
+            rng = random.Random(seed)
+            questions = data['questions']
+            for n_answered in range(len(questions) - 5, len(questions) + 1):
+                partial = _random_answers(rng, questions[:n_answered])
+                status = scorer.check_early_finish(partial)
+                candidate_ids = {b['id'] for b in status['candidates']}
+                rest = [q['id'] for q in questions[n_answered:]]
+                reachable = set()
+                for choices in itertools.product(ANSWER_CHOICES, repeat=len(rest)):
+                    answers = {**partial, **dict(zip(rest, choices))}
+                    nearest = scorer.nearest_birds(scorer.compute_scores(answers))
+                    reachable.update(b['id'] for b in nearest)
+                self.assertLessEqual(reachable, candidate_ids)
+                if status['decided']:
+                    self.assertEqual(reachable, {status['bird']['id']})
+
+    # 確定判定は全回答時の結果と一致する（サンプリングで検証）
+    def test_decided_agrees_with_full_answers(self):
+        decided_count = 0
+        for seed in range(10):
+            data = _with_matching_scores(build_fixture_data(seed=seed), seed)
+            scorer = ShindanScorer(data)
+            rng = random.Random(seed)
+            questions = data['questions']
+            for _ in range(30):
+                full = _random_answers(rng, questions)
+                for n_answered in range(len(questions) + 1):
+                    partial = dict(itertools.islice(full.items(), n_answered))
+                    status = scorer.check_early_finish(partial)
+                    if status['decided']:
+                        decided_count += 1
+                        _, expected_ids = _reference_result(data, full)
+                        self.assertEqual(expected_ids, [status['bird']['id']])
+                        break
+        self.assertGreater(decided_count, 0)
+
+    # 全回答時は候補が最近傍の鳥と一致し、残り質問数は0
+    def test_full_answers_leave_only_nearest(self):
+        data = build_fixture_data()
+        scorer = ShindanScorer(data)
+        answers = _random_answers(random.Random(1), data['questions'])
+        status = scorer.check_early_finish(answers, suggest_next=True)
+        nearest = scorer.nearest_birds(scorer.compute_scores(answers))
+        self.assertEqual(status['remaining_questions'], 0)
+        self.assertEqual([b['id'] for b in status['candidates']], [b['id'] for b in nearest])
+        self.assertIsNone(status['next_question'])
+
+    # 次の質問の提案は未回答の質問から選ばれる
+    def test_suggest_next_picks_unanswered_question(self):
+        data = build_fixture_data()
+        scorer = ShindanScorer(data)
+        questions = data['questions']
+        partial = _random_answers(random.Random(2), questions[:5])
+        status = scorer.check_early_finish(partial, suggest_next=True)
+        self.assertFalse(status['decided'])
+        self.assertEqual(status['remaining_questions'], len(questions) - 5)
+        self.assertNotIn(status['next_question']['id'], partial)
+        self.assertIsNone(scorer.check_early_finish(partial)['next_question'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import asyncio
+import json
+import time
+
+# AI生成ビューの動作確認用ローカルフェイクプロバイダー
+# 遅延を入れて固定のJSONを返すため、ネットワークやAPIキーなしで長時間生成を再現できる
+#
+# 使い方（テストやシェルで AIProviderFactory.create を差し替える）:
+#   from unittest import mock
+#   from plugins.shindan.tools.fake_ai_provider import FakeAIProvider
+#   with mock.patch('plugins.shindan.views.apis.ai_generate.AIProviderFactory.create',
+#                   return_value=FakeAIProvider(delay=30)):
+#       ...
+
+DEFAULT_RESULT = [{
+    'name': 'フェイク成分',
+    'description': 'フェイクプロバイダーが返す固定の生成結果です。',
+    'positive': '',
+    'negative': '',
+}]
+
+
+# 同期インターフェースのみのフェイク（スレッド退避のフォールバック経路を確認する）
+class FakeAIProvider:
+    # Args:
+    #   delay: 生成にかかる秒数
+    #   result: 返却するJSON化可能なデータ
+    def __init__(self, delay=10.0, result=None):
+        self.delay = delay
+        self.result = DEFAULT_RESULT if result is None else result
+
+    def generate_text(self, system_prompt, user_prompt):
+        time.sleep(self.delay)
+        return '```json\n' + json.dumps(self.result, ensure_ascii=False) + '\n```'
+
+
+# 非同期インターフェース（agenerate_text）を持つフェイク
+class AsyncFakeAIProvider(FakeAIProvider):
+    async def agenerate_text(self, system_prompt, user_prompt):
+        await asyncio.sleep(self.delay)
+        return '```json\n' + json.dumps(self.result, ensure_ascii=False) + '\n```'
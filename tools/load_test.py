@@ -0,0 +1,475 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import re
+import resource
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from unittest import mock
+
+import numpy as np
+
+from plugins.shindan.scoring import ANSWER_CHOICES
+
+# shindan 公開フローの負荷試験ハーネス
+# TopView の GET → api/result/ への回答 POST を複数ワーカープロセスで並行実行し、
+# レイテンシ（p50/p95/p99）・スループット・エラー率・ワーカーごとのメモリを JSON で出力する
+# 各ワーカーはインメモリ SQLite + ローカルメモリキャッシュで Django を起動し、
+# StatsUtil はスタブに差し替えるため、ネットワークや本番DBは不要
+#
+# 使い方:
+#   python -m plugins.shindan.tools.load_test --settings config.settings \
+#       --workers 8 --iterations 200 --output loadtest.json
+
+DEFAULT_BASE_PATH = '/plugins/shindan/'
+# 全ワーカーのセットアップ完了を待つ上限（秒）
+DEFAULT_SETUP_TIMEOUT = 300
+# 計測開始から全ワーカーの結果が揃うまでの上限（秒）
+DEFAULT_RUN_TIMEOUT = 1800
+# 結果キューのポーリング間隔（秒）
+_POLL_INTERVAL = 1.0
+SHINDAN_DATA_PATTERN = re.compile(
+    r'<script id="shindan-data" type="application/json">(.*?)</script>', re.S
+)
+
+
+# StatsUtil のスタブ（PV/UU記録を行わない）
+class _StatsUtilStub:
+    @staticmethod
+    def record_page_view(*args, **kwargs):
+        pass
+
+
+# 負荷試験用の診断データを生成
+# Args:
+#   n_components: 成分数
+#   n_questions: 質問数
+#   n_birds: 野鳥数
+#   seed: 乱数シード
+# Returns:
+#   dict: プラグインデータ（components, questions, birds）
+def build_fixture_data(n_components=7, n_questions=30, n_birds=16, seed=0):
+    rng = random.Random(seed)
+    components = [{
+        'id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'name': f'成分{i + 1}',
+        'description': '',
+        'positive': '',
+        'negative': '',
+        'sort_order': i,
+    } for i in range(n_components)]
+
+    questions = []
+    for i in range(n_questions):
+        # 約3割を逆転項目にする
+        sign = -1 if rng.random() < 0.3 else 1
+        targets = rng.sample(components, k=min(2, n_components))
+        weights = {c['name']: rng.randint(1, 3) * sign for c in targets}
+        scores = {}
+        for choice, factor in zip(ANSWER_CHOICES, (1, 0.5, -0.5, -1)):
+            scores[choice] = {name: round(w * factor) for name, w in weights.items()}
+        questions.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'question_text': f'質問{i + 1}',
+            'scores': scores,
+            'sort_order': i,
+        })
+
+    birds = [{
+        'id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'name': f'野鳥{i + 1}',
+        'description': '',
+        'scores': {c['name']: rng.randint(1, 10) for c in components},
+    } for i in range(n_birds)]
+
+    return {'components': components, 'questions': questions, 'birds': birds}
+
+
+# ワーカー内で Django をインメモリ SQLite で起動し、診断データを投入する
+# NOTICE: django.setup() より前に DATABASES / CACHES を差し替える必要がある
+def _setup_django(settings_module, plugin_data):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+    }
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+    django.setup()
+
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    call_command('migrate', run_syncdb=True, verbosity=0, interactive=False)
+
+    from plugins.shindan.plugin import ShindanPlugin
+
+    plugin = ShindanPlugin()
+    plugin.compute_matching_scores(plugin_data)
+    plugin.save_data(plugin_data)
+
+
+# 1回分のユーザーフロー（トップ表示 → 回答送信）を実行
+# 途中で例外が発生しても完了済みリクエストの計測値が残るよう samples に直接追記する
+# Args:
+#   samples: 計測値の追記先 [(endpoint, elapsed_sec, status), ...]
+def _run_flow(client, base_path, rng, samples):
+    start = time.perf_counter()
+    response = client.get(base_path)
+    samples.append(('top', time.perf_counter() - start, response.status_code))
+    if response.status_code != 200:
+        return
+
+    match = SHINDAN_DATA_PATTERN.search(response.content.decode('utf-8'))
+    if not match:
+        # 埋め込みデータが取れない場合はトップページのエラーとして扱う
+        samples[-1] = ('top', samples[-1][1], 0)
+        return
+    questions = json.loads(match.group(1)).get('questions', [])
+    answers = {q['id']: rng.choice(ANSWER_CHOICES) for q in questions}
+
+    start = time.perf_counter()
+    response = client.post(
+        f'{base_path}api/result/',
+        data=json.dumps({'answers': answers}),
+        content_type='application/json',
+    )
+    samples.append(('result', time.perf_counter() - start, response.status_code))
+
+
+# プロセスの最大RSSをKB単位で取得（macOS はバイト、Linux はKB単位で返る）
+def _max_rss_kb():
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return max_rss // 1024
+    return max_rss
+
+
+# ワーカープロセスのエントリポイント
+# 全ワーカーのセットアップ完了をバリアで待ってから計測を開始する
+def _worker_main(worker_id, config, barrier, result_queue):
+    try:
+        _setup_django(config['settings'], config['plugin_data'])
+    except Exception as e:
+        barrier.abort()
+        result_queue.put({'worker': worker_id, 'error': f'セットアップ失敗: {e}'})
+        return
+
+    from django.test import Client
+
+    from plugins.shindan.plugin import ShindanPlugin
+
+    rng = random.Random(config['seed'] + worker_id)
+    samples = []
+    flow_times = []
+    exceptions = 0
+    # 例外の型ごとの件数と最初のメッセージ
+    exception_types = {}
+    exception_messages = {}
+
+    with mock.patch('plugins.shindan.views.pages.top.StatsUtil', _StatsUtilStub), \
+            mock.patch.object(ShindanPlugin, 'is_public', return_value=True):
+        client = Client()
+        try:
+            for _ in range(config['warmup']):
+                _run_flow(client, config['base_path'], rng, [])
+        except Exception as e:
+            barrier.abort()
+            result_queue.put({'worker': worker_id, 'error': f'ウォームアップ失敗: {type(e).__name__}: {e}'})
+            return
+
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            result_queue.put({'worker': worker_id, 'error': '他ワーカーのセットアップ失敗により中断'})
+            return
+        started = time.perf_counter()
+        for _ in range(config['iterations']):
+            flow_start = time.perf_counter()
+            try:
+                _run_flow(client, config['base_path'], rng, samples)
+            except Exception as e:
+                exceptions += 1
+                name = type(e).__name__
+                exception_types[name] = exception_types.get(name, 0) + 1
+                exception_messages.setdefault(name, str(e)[:500])
+                continue
+            flow_times.append(time.perf_counter() - flow_start)
+        elapsed = time.perf_counter() - started
+
+    result_queue.put({
+        'worker': worker_id,
+        'elapsed': elapsed,
+        'samples': samples,
+        'flow_times': flow_times,
+        'exceptions': exceptions,
+        'exception_types': exception_types,
+        'exception_messages': exception_messages,
+        'max_rss_kb': _max_rss_kb(),
+    })
+
+
+# レイテンシ統計を算出（ミリ秒）
+def _latency_summary(latencies):
+    if not latencies:
+        return {'count': 0}
+    values = np.array(latencies) * 1000
+    return {
+        'count': int(values.size),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+        'max_ms': round(float(values.max()), 3),
+    }
+
+
+# ワーカー結果を集計してレポートを作成
+# Args:
+#   worker_results: 各ワーカーの結果リスト
+#   wall_time: 計測区間の経過時間（秒）
+# Returns:
+#   dict: レポート
+def summarize(worker_results, wall_time):
+    endpoints = {}
+    flow_times = []
+    for result in worker_results:
+        flow_times.extend(result.get('flow_times', []))
+        for endpoint, elapsed, status in result.get('samples', []):
+            entry = endpoints.setdefault(endpoint, {'latencies': [], 'statuses': {}})
+            entry['latencies'].append(elapsed)
+            entry['statuses'][str(status)] = entry['statuses'].get(str(status), 0) + 1
+
+    endpoint_report = {}
+    total_requests = 0
+    for endpoint, entry in endpoints.items():
+        count = len(entry['latencies'])
+        errors = sum(n for status, n in entry['statuses'].items() if status != '200')
+        total_requests += count
+        endpoint_report[endpoint] = {
+            **_latency_summary(entry['latencies']),
+            'errors': errors,
+            'error_rate': round(errors / count, 4) if count else 0.0,
+            'statuses': entry['statuses'],
+        }
+
+    exceptions = sum(r.get('exceptions', 0) for r in worker_results)
+    exception_types = {}
+    for result in worker_results:
+        for name, n in result.get('exception_types', {}).items():
+            exception_types[name] = exception_types.get(name, 0) + n
+    flows = len(flow_times)
+    return {
+        'wall_time_sec': round(wall_time, 3),
+        'throughput': {
+            'flows_per_sec': round(flows / wall_time, 3) if wall_time > 0 else 0.0,
+            'requests_per_sec': round(total_requests / wall_time, 3) if wall_time > 0 else 0.0,
+        },
+        'flow': {
+            **_latency_summary(flow_times),
+            'exceptions': exceptions,
+            'exception_types': exception_types,
+            'error_rate': round(exceptions / (flows + exceptions), 4) if flows + exceptions else 0.0,
+        },
+        'endpoints': endpoint_report,
+        'workers': [{
+            'worker': r['worker'],
+            'flows': len(r.get('flow_times', [])),
+            'exceptions': r.get('exceptions', 0),
+            'exception_types': r.get('exception_types', {}),
+            'exception_messages': r.get('exception_messages', {}),
+            'elapsed_sec': round(r.get('elapsed', 0.0), 3),
+            'max_rss_kb': r.get('max_rss_kb'),
+            'error': r.get('error'),
+        } for r in sorted(worker_results, key=lambda r: r['worker'])],
+    }
+
+
+# 負荷試験を実行
+# Args:
+#   settings: Django 設定モジュール
+#   workers: 並行ワーカー数
+#   iterations: ワーカーごとのフロー実行回数
+#   warmup: 計測前のウォームアップ回数
+#   plugin_data: 診断データ（None なら合成データを使用）
+#   base_path: shindan プラグインのURLプレフィックス
+#   seed: 乱数シード
+#   setup_timeout: 全ワーカーのセットアップ完了を待つ上限（秒）
+#   run_timeout: 計測開始から全ワーカーの結果が揃うまでの上限（秒）
+# Returns:
+#   dict: レポート
+def run(settings, workers=4, iterations=100, warmup=5, plugin_data=None,
+        base_path=DEFAULT_BASE_PATH, seed=0, setup_timeout=DEFAULT_SETUP_TIMEOUT,
+        run_timeout=DEFAULT_RUN_TIMEOUT):
+    if plugin_data is None:
+        plugin_data = build_fixture_data(seed=seed)
+
+    config = {
+        'settings': settings,
+        'iterations': iterations,
+        'warmup': warmup,
+        'plugin_data': plugin_data,
+        'base_path': base_path,
+        'seed': seed,
+    }
+
+    # fork 済みの Django 状態を引き継がないよう spawn で起動
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(workers + 1)
+    result_queue = ctx.Queue()
+    processes = [
+        ctx.Process(target=_worker_main, args=(i, config, barrier, result_queue))
+        for i in range(workers)
+    ]
+    started_at = datetime.now(timezone.utc).isoformat()
+    for process in processes:
+        process.start()
+
+    started = time.perf_counter()
+    try:
+        # タイムアウト時はバリアが壊れ、待機中のワーカーは中断を報告して終了する
+        barrier.wait(timeout=setup_timeout)
+        started = time.perf_counter()
+    except threading.BrokenBarrierError:
+        pass
+
+    # キューを先に読み切らないと大きな結果で join がブロックする
+    worker_results = _collect_results(processes, result_queue, started + run_timeout)
+    wall_time = time.perf_counter() - started
+    for process in processes:
+        process.join(timeout=_POLL_INTERVAL)
+
+    report = summarize(worker_results, wall_time)
+    report['config'] = {
+        'settings': settings,
+        'workers': workers,
+        'iterations': iterations,
+        'warmup': warmup,
+        'base_path': base_path,
+        'seed': seed,
+        'n_questions': len(plugin_data.get('questions', [])),
+        'n_birds': len(plugin_data.get('birds', [])),
+    }
+    report['started_at'] = started_at
+    return report
+
+
+# ワーカー結果を回収する
+# 結果を返さずに終了したワーカー（OOM・segfault 等）や期限超過のワーカーはエラーとして記録する
+# Args:
+#   processes: ワーカープロセスのリスト
+#   result_queue: 結果キュー
+#   deadline: 回収の期限（time.perf_counter 基準）
+# Returns:
+#   list: 各ワーカーの結果
+def _collect_results(processes, result_queue, deadline):
+    results = {}
+    # 終了を検出したが結果が未着のワーカー（キュー到着の遅れを1周期だけ待つ）
+    exited = set()
+    while len(results) < len(processes):
+        try:
+            result = result_queue.get(timeout=_POLL_INTERVAL)
+            results[result['worker']] = result
+            continue
+        except queue.Empty:
+            pass
+
+        for worker_id, process in enumerate(processes):
+            if worker_id in results or process.exitcode is None:
+                continue
+            if worker_id in exited:
+                results[worker_id] = {
+                    'worker': worker_id,
+                    'error': f'結果を返さずに終了 (exitcode={process.exitcode})',
+                }
+            else:
+                exited.add(worker_id)
+
+        if time.perf_counter() > deadline:
+            for worker_id, process in enumerate(processes):
+                if worker_id in results:
+                    continue
+                process.terminate()
+                results[worker_id] = {'worker': worker_id, 'error': 'タイムアウトにより強制終了'}
+    return list(results.values())
+
+
+# レポートから終了コードを決定
+# ワーカーのエラー・フロー中の例外・非200レスポンスのいずれかがあれば失敗（1）とする
+# Returns:
+#   int: 終了コード
+def exit_code(report):
+    if any(w.get('error') for w in report['workers']):
+        return 1
+    if report['flow'].get('error_rate', 0) > 0:
+        return 1
+    if any(e.get('errors', 0) > 0 for e in report['endpoints'].values()):
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='shindan 公開フローの負荷試験')
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE'),
+                        help='Django 設定モジュール（既定: DJANGO_SETTINGS_MODULE）')
+    parser.add_argument('--workers', type=int, default=4, help='並行ワーカープロセス数')
+    parser.add_argument('--iterations', type=int, default=100, help='ワーカーごとのフロー回数')
+    parser.add_argument('--warmup', type=int, default=5, help='計測前のウォームアップ回数')
+    parser.add_argument('--data', help='診断データJSON（設定APIの data 部分）。省略時は合成データ')
+    parser.add_argument('--base-path', default=DEFAULT_BASE_PATH, help='プラグインのURLプレフィックス')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    parser.add_argument('--setup-timeout', type=float, default=DEFAULT_SETUP_TIMEOUT,
+                        help='全ワーカーのセットアップ完了を待つ上限（秒）')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_RUN_TIMEOUT,
+                        help='計測開始から全ワーカーの結果が揃うまでの上限（秒）')
+    parser.add_argument('--output', help='結果JSONの出力先（省略時は標準出力）')
+    args = parser.parse_args(argv)
+
+    if not args.settings:
+        parser.error('--settings または DJANGO_SETTINGS_MODULE を指定してください')
+
+    plugin_data = None
+    if args.data:
+        with open(args.data, encoding='utf-8') as f:
+            plugin_data = json.load(f)
+
+    report = run(
+        args.settings,
+        workers=args.workers,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        plugin_data=plugin_data,
+        base_path=args.base_path,
+        seed=args.seed,
+        setup_timeout=args.setup_timeout,
+        run_timeout=args.timeout,
+    )
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    return exit_code(report)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
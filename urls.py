@@ -2,6 +2,7 @@ from django.urls import path
 
 from plugins.shindan.views.pages.top import TopView
 from plugins.shindan.views.apis.result import ResultView
+from plugins.shindan.views.apis.early_finish import EarlyFinishView
 from plugins.shindan.views.apis.settings import SettingsView
 from plugins.shindan.views.apis.ai_generate import AiGenerateView
 
@@ -12,6 +13,7 @@ urlpatterns = [
     path('result/', TopView.as_view(), name='top_result'),
     # 公開API
     path('api/result/', ResultView.as_view(), name='api_result'),
+    path('api/early_finish/', EarlyFinishView.as_view(), name='api_early_finish'),
     # 管理用API
     path('api/settings/', SettingsView.as_view(), name='api_settings'),
     path('api/ai/generate/', AiGenerateView.as_view(), name='api_ai_generate'),
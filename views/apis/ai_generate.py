@@ -1,6 +1,8 @@
+import asyncio
 import json
 
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
 from django.views import View
 from django.views.decorators.csrf import csrf_protect
 from django.utils.decorators import method_decorator
@@ -14,8 +16,12 @@ from utils.setting_util import SettingUtil
 
 # shindan プラグインのAI生成API
 # 成分・質問・野鳥の各データをAIで生成
-@method_decorator(admin_required, name='dispatch')
-@method_decorator(csrf_protect, name='dispatch')
+# AI生成は数十秒かかるため非同期ビューとして実装し、ASGI 環境では待機中にワーカーを占有しない
+# NOTICE: Django 5.0 以上が必要（csrf_protect / method_decorator が async なビュー関数に対応したのが 5.0）
+#   csrf_protect は async な post に直接付けること。同期の dispatch に付けると、未 await のコルーチンに
+#   process_response が実行されてしまう
+# NOTICE: 管理者チェック（admin_required）は同期デコレーターのため、async な dispatch からスレッド経由で呼ぶ。
+#   入力検証・設定読み書きもDBアクセスを伴うため sync_to_async 経由で実行する
 class AiGenerateView(View):
     _KEY_MAP = {
         'gemini': 'ai_gemini_api_key',
@@ -23,6 +29,20 @@ class AiGenerateView(View):
         'claude': 'ai_claude_api_key',
     }
 
+    # AI生成のタイムアウト（秒）
+    _GENERATE_TIMEOUT = 120
+
+    # 全メソッド共通で、CSRF検証より先に管理者チェックを行う
+    async def dispatch(self, request, *args, **kwargs):
+        denied = await sync_to_async(admin_required(self._admin_passed))(request)
+        if denied is not None:
+            return denied
+        return await super().dispatch(request, *args, **kwargs)
+
+    # admin_required を通過した場合は None を返す
+    def _admin_passed(self, request):
+        return None
+
     # AI生成リクエスト処理
     # Request body:
     #   type: 生成タイプ（'component', 'question', 'bird'）
@@ -30,8 +50,52 @@ class AiGenerateView(View):
     #   model: モデルID
     #   system_prompt: システムプロンプト
     #   user_prompt: ユーザープロンプト（生成対象のデータ）
-    def post(self, request):
+    @method_decorator(csrf_protect)
+    async def post(self, request):
         LoggerUtil.prepare()
+        prepared = await sync_to_async(self._prepare)(request)
+        if isinstance(prepared, HttpResponse):
+            return prepared
+
+        setting_util = prepared['setting_util']
+        provider_name = prepared['provider_name']
+        model_id = prepared['model_id']
+
+        generated_text = ''
+        try:
+            provider = AIProviderFactory.create(provider_name, prepared['api_key'], model_id)
+            generated_text = await asyncio.wait_for(
+                self._generate_text(provider, prepared['system_prompt'], prepared['user_prompt']),
+                timeout=self._GENERATE_TIMEOUT,
+            )
+
+            # JSONレスポンスを抽出（マークダウンコードブロックの除去）
+            result = self._extract_json(generated_text)
+
+            # 最終使用モデルを保存
+            await sync_to_async(self._save_selected_model)(setting_util, provider_name, model_id)
+
+            return JsonResponse({'success': True, 'result': result})
+        except asyncio.TimeoutError:
+            LoggerUtil.warn(f"AI生成がタイムアウト: {provider_name}/{model_id}")
+            return JsonResponse({'error': 'AI生成がタイムアウトしました。再度お試しください。'}, status=504)
+        except asyncio.CancelledError:
+            # クライアント切断時（ASGI）。同期プロバイダーのスレッドは完了まで走り続けるが結果は破棄される
+            LoggerUtil.info(f"AI生成がクライアント切断によりキャンセル: {provider_name}/{model_id}")
+            raise
+        except AIProviderError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        except json.JSONDecodeError:
+            LoggerUtil.warn(f"AI生成結果のJSONパースに失敗: {generated_text[:500]}")
+            return JsonResponse({'error': 'AI生成結果のJSONパースに失敗しました。再度お試しください。'}, status=400)
+        except Exception as e:
+            LoggerUtil.error(f"AI生成エラー: {e}", e)
+            return JsonResponse({'error': 'AI生成に失敗しました'}, status=500)
+
+    # リクエストの検証とAPIキーの取得（同期処理）
+    # Returns:
+    #   dict: 生成パラメータ、または JsonResponse: エラーレスポンス
+    def _prepare(self, request):
         try:
             body = json.loads(request.body)
         except json.JSONDecodeError:
@@ -61,25 +125,26 @@ class AiGenerateView(View):
         if not api_key:
             return JsonResponse({'error': 'APIキーが設定されていません'}, status=400)
 
-        try:
-            provider = AIProviderFactory.create(provider_name, api_key, model_id)
-            generated_text = provider.generate_text(system_prompt, user_prompt)
-
-            # JSONレスポンスを抽出（マークダウンコードブロックの除去）
-            result = self._extract_json(generated_text)
-
-            # 最終使用モデルを保存
-            self._save_selected_model(setting_util, provider_name, model_id)
+        return {
+            'setting_util': setting_util,
+            'provider_name': provider_name,
+            'model_id': model_id,
+            'api_key': api_key,
+            'system_prompt': system_prompt,
+            'user_prompt': user_prompt,
+        }
 
-            return JsonResponse({'success': True, 'result': result})
-        except AIProviderError as e:
-            return JsonResponse({'error': str(e)}, status=400)
-        except json.JSONDecodeError:
-            LoggerUtil.warn(f"AI生成結果のJSONパースに失敗: {generated_text[:500]}")
-            return JsonResponse({'error': 'AI生成結果のJSONパースに失敗しました。再度お試しください。'}, status=400)
-        except Exception as e:
-            LoggerUtil.error(f"AI生成エラー: {e}", e)
-            return JsonResponse({'error': 'AI生成に失敗しました'}, status=500)
+    # プロバイダーでテキスト生成
+    # 非同期インターフェース（agenerate_text）があればそれを await し、
+    # なければ同期の generate_text を別スレッドで実行する
+    async def _generate_text(self, provider, system_prompt, user_prompt):
+        agenerate_text = getattr(provider, 'agenerate_text', None)
+        if agenerate_text is not None:
+            return await agenerate_text(system_prompt, user_prompt)
+        # thread_sensitive=False: DBアクセス用の共有スレッドを長時間ふさがない
+        return await sync_to_async(provider.generate_text, thread_sensitive=False)(
+            system_prompt, user_prompt
+        )
 
     # AI生成結果からJSONを抽出
     # マークダウンのコードブロック（```json ... ```）を除去してパース
@@ -0,0 +1,60 @@
+import json
+
+from django.http import JsonResponse
+from django.views import View
+
+from plugins.shindan.plugin import ShindanPlugin
+from plugins.shindan.scoring import ShindanScorer
+from utils.logger_util import LoggerUtil
+
+
+# 途中終了判定API
+# 途中までの回答から最終スコアの取りうる範囲を求め、マッチする鳥が確定したかを返す
+# 公開時は認証不要、非公開時は管理者のみ
+class EarlyFinishView(View):
+    # POST /plugins/shindan/api/early_finish/
+    # Args:
+    #   request.body: {
+    #     answers: { question_id: "yes"|"slightly_yes"|"slightly_no"|"no", ... },
+    #     suggest_next: 次に出すべき質問IDを返すか（省略時 false）
+    #   }
+    # Returns:
+    #   JsonResponse: { success, decided, bird, candidates, remaining_questions, next_question_id }
+    def post(self, request):
+        LoggerUtil.prepare()
+        LoggerUtil.info(f"POST {request.path}")
+
+        plugin = ShindanPlugin()
+
+        # アクセス制御: 非公開かつ非管理者 → 403
+        if not plugin.is_public() and not request.session.get('is_admin', False):
+            return JsonResponse({'error': 'Forbidden'}, status=403)
+
+        try:
+            body = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({'error': '無効なJSONです'}, status=400)
+
+        answers = body.get('answers', {})
+        if not isinstance(answers, dict):
+            return JsonResponse({'error': '回答の形式が不正です'}, status=400)
+        suggest_next = body.get('suggest_next', False)
+        if not isinstance(suggest_next, bool):
+            return JsonResponse({'error': 'suggest_next の形式が不正です'}, status=400)
+
+        scorer = ShindanScorer(plugin.get_data())
+        if not scorer.is_ready():
+            return JsonResponse({'error': '診断データが未設定です'}, status=400)
+
+        status = scorer.check_early_finish(answers, suggest_next=suggest_next)
+        bird = status['bird']
+        next_question = status['next_question']
+
+        return JsonResponse({
+            'success': True,
+            'decided': status['decided'],
+            'bird': {'id': bird['id'], 'name': bird['name']} if bird else None,
+            'candidates': [b['id'] for b in status['candidates']],
+            'remaining_questions': status['remaining_questions'],
+            'next_question_id': next_question['id'] if next_question else None,
+        })